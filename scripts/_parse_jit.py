@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Numba-compiled fast path for parsing simulation logs.
+
+Scans the raw log bytes for the five known metric line prefixes and
+writes completed sample rows straight into a preallocated output array,
+bypassing CPython string handling entirely. analyze.py imports this
+module optionally and falls back to its pure-Python parser when numba
+is not installed.
+"""
+import numpy as np
+from numba import njit
+
+# Field order matches the analyzer's buffer columns:
+# ipc, cache_hit_rate, branch_accuracy, context_switches, memory_usage
+N_FIELDS = 5
+_ALL_SEEN = (1 << N_FIELDS) - 1
+
+# Full "Name:" prefixes, padded into a fixed-width byte table the jitted
+# scanner can index. Matching the whole prefix mirrors the fallback
+# regex; classifying by the first bytes alone also caught unrelated
+# simulator output such as "Correct predictions:" or "Commands:"
+_PREFIX_STRINGS = (b'IPC:', b'Cache hit rate:', b'Branch accuracy:',
+                   b'Context switches:', b'Memory usage:')
+_PREFIX_LENS = np.array([len(p) for p in _PREFIX_STRINGS], dtype=np.int64)
+_PREFIX_TABLE = np.zeros((N_FIELDS, int(_PREFIX_LENS.max())), dtype=np.uint8)
+for _col, _prefix in enumerate(_PREFIX_STRINGS):
+    _PREFIX_TABLE[_col, :len(_prefix)] = np.frombuffer(_prefix, dtype=np.uint8)
+
+
+@njit(cache=True, nogil=True)
+def _parse_number(buf, i, end):
+    """Parse a decimal number from buf[i:end], returning (value, next_i)"""
+    while i < end and buf[i] == 32:  # skip spaces
+        i += 1
+    sign = 1.0
+    if i < end and buf[i] == 45:  # '-'
+        sign = -1.0
+        i += 1
+    value = 0.0
+    while i < end and 48 <= buf[i] <= 57:
+        value = value * 10.0 + (buf[i] - 48)
+        i += 1
+    if i < end and buf[i] == 46:  # '.'
+        i += 1
+        scale = 0.1
+        while i < end and 48 <= buf[i] <= 57:
+            value += (buf[i] - 48) * scale
+            scale *= 0.1
+            i += 1
+    return sign * value, i
+
+
+@njit(cache=True, nogil=True)
+def parse_log(buf, out):
+    """Scan raw log bytes and fill rows of `out`; returns rows written.
+
+    buf is the whole log as uint8, out is an (nrows, 7) float64 array.
+    A row is emitted each time all five metric fields have been seen.
+    """
+    nrows = out.shape[0]
+    row = np.zeros(N_FIELDS, dtype=np.float64)
+    n = 0
+    seen = 0
+    size = buf.size
+    i = 0
+    while i < size and n < nrows:
+        j = i
+        while j < size and buf[j] != 10:  # find end of line
+            j += 1
+        # Accept a line only when its full "Name:" prefix matches one
+        # of the known metric fields
+        for col in range(N_FIELDS):
+            plen = _PREFIX_LENS[col]
+            if j - i < plen:
+                continue
+            k = 0
+            while k < plen and buf[i + k] == _PREFIX_TABLE[col, k]:
+                k += 1
+            if k == plen:
+                value, _ = _parse_number(buf, i + plen, j)
+                row[col] = value
+                seen |= 1 << col
+                if seen == _ALL_SEEN:
+                    out[n, :N_FIELDS] = row
+                    out[n, N_FIELDS:] = 0.0
+                    n += 1
+                    seen = 0
+                break
+        i = j + 1
+    return n
@@ -1,94 +1,181 @@
 #!/usr/bin/env python3
 import json
-import csv
-import statistics
+import re
+import time
 import numpy as np
-from dataclasses import dataclass
 from typing import List, Dict, Any
-import matplotlib.pyplot as plt
-
-@dataclass
-class PerformanceMetrics:
-    ipc: float
-    cache_hit_rate: float
-    branch_accuracy: float
-    context_switches: int
-    memory_usage: int
-    power_consumption: float
-    deadline_misses: int
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json works, just slower
+    orjson = None
+
+try:
+    from _parse_jit import parse_log as _parse_log_jit
+except ImportError:  # numba is optional; fall back to the pure-Python parser
+    _parse_log_jit = None
+
+
+def _write_json(path: str, obj: Dict[str, Any]):
+    """Write a report as JSON in one call, via orjson when available"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(
+                obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2)
+
+# Column layout of the metrics buffer (struct-of-arrays: one column per field)
+(COL_IPC, COL_CACHE_HIT, COL_BRANCH_ACC, COL_CTX_SWITCHES,
+ COL_MEM_USAGE, COL_POWER, COL_DEADLINE_MISSES) = range(7)
+N_COLS = 7
 
 class PerformanceAnalyzer:
     def __init__(self):
-        self.metrics = []
-    
+        # Samples live in a single contiguous float64 array so the stats
+        # reduce to one vectorized pass per reduction instead of
+        # per-metric Python list traversals
+        self._buf = np.empty((0, N_COLS), dtype=np.float64)
+        self._n = 0
+        self._means = None
+
+    @property
+    def samples(self) -> np.ndarray:
+        """View of the filled portion of the metrics buffer"""
+        return self._buf[:self._n]
+
+    @property
+    def means(self) -> np.ndarray:
+        """Per-column means, computed once per batch of appends"""
+        if self._means is None:
+            self._means = self.samples.mean(axis=0)
+        return self._means
+
+    def _append_row(self, row):
+        """Append one sample row, growing the buffer in power-of-two chunks"""
+        if self._n == len(self._buf):
+            grown = np.empty((max(16, 2 * len(self._buf)), N_COLS), dtype=np.float64)
+            grown[:self._n] = self._buf[:self._n]
+            self._buf = grown
+        self._buf[self._n] = row
+        self._n += 1
+        self._means = None
+
+    def _append_block(self, rows):
+        """Append a block of sample rows in one copy"""
+        needed = self._n + len(rows)
+        if needed > len(self._buf):
+            cap = max(16, len(self._buf))
+            while cap < needed:
+                cap *= 2
+            grown = np.empty((cap, N_COLS), dtype=np.float64)
+            grown[:self._n] = self._buf[:self._n]
+            self._buf = grown
+        self._buf[self._n:needed] = rows
+        self._n = needed
+        self._means = None
+
+    # One compiled-regex pass per line matches the known metric prefixes
+    # and captures the numeric value, leaving '%'/'MB' suffixes behind
+    _LINE_RE = re.compile(
+        r'^(IPC|Cache hit rate|Branch accuracy|Context switches|Memory usage)'
+        r':\s*(-?[\d.]+)')
+    _FIELDS = {
+        'IPC': COL_IPC,
+        'Cache hit rate': COL_CACHE_HIT,
+        'Branch accuracy': COL_BRANCH_ACC,
+        'Context switches': COL_CTX_SWITCHES,
+        'Memory usage': COL_MEM_USAGE,
+    }
+    _ALL_SEEN = (1 << len(_FIELDS)) - 1
+
     def load_from_log(self, logfile: str):
         """Load performance metrics from simulation log"""
+        if _parse_log_jit is not None:
+            # Compiled fast path: hand the raw bytes to the numba kernel,
+            # which fills sample rows directly into a preallocated array
+            with open(logfile, 'rb') as f:
+                data = f.read()
+            out = np.empty((data.count(b'\n') // len(self._FIELDS) + 1, N_COLS),
+                           dtype=np.float64)
+            n_rows = _parse_log_jit(np.frombuffer(data, dtype=np.uint8), out)
+            self._append_block(out[:n_rows])
+            return
+
+        row = np.zeros(N_COLS, dtype=np.float64)
+        seen = 0
         with open(logfile, 'r') as f:
             for line in f:
-                if 'IPC:' in line:
-                    ipc = float(line.split(':')[1].strip())
-                elif 'Cache hit rate:' in line:
-                    hit_rate = float(line.split(':')[1].strip().replace('%', ''))
-                elif 'Branch accuracy:' in line:
-                    branch_acc = float(line.split(':')[1].strip().replace('%', ''))
-                elif 'Context switches:' in line:
-                    ctx_switches = int(line.split(':')[1].strip())
-                elif 'Memory usage:' in line:
-                    mem_usage = int(line.split(':')[1].strip().replace('MB', ''))
-                
-                # When we have all metrics, create object
-                if all(var in locals() for var in ['ipc', 'hit_rate', 'branch_acc', 'ctx_switches', 'mem_usage']):
-                    metric = PerformanceMetrics(
-                        ipc=ipc,
-                        cache_hit_rate=hit_rate,
-                        branch_accuracy=branch_acc,
-                        context_switches=ctx_switches,
-                        memory_usage=mem_usage,
-                        power_consumption=0.0,  # Would come from power log
-                        deadline_misses=0       # Would come from RTOS log
-                    )
-                    self.metrics.append(metric)
+                m = self._LINE_RE.match(line)
+                if m is None:
+                    continue
+                col = self._FIELDS[m.group(1)]
+                row[col] = float(m.group(2))
+                seen |= 1 << col
+
+                # Emit a row only once all five fields of a sample are seen
+                if seen == self._ALL_SEEN:
+                    # Power consumption and deadline misses would come from
+                    # the power/RTOS logs
+                    row[COL_POWER] = 0.0
+                    row[COL_DEADLINE_MISSES] = 0
+                    self._append_row(row)
+                    seen = 0
     
     def calculate_statistics(self) -> Dict[str, Any]:
         """Calculate statistical analysis of metrics"""
-        if not self.metrics:
+        if self._n == 0:
             return {}
-        
+
+        # One C-level reduction per statistic over the whole buffer instead
+        # of a Python-level traversal per metric per statistic
+        buf = self.samples
+        means = self.means
+        medians = np.median(buf, axis=0)
+        stdevs = buf.std(axis=0, ddof=1) if self._n > 1 else np.zeros(N_COLS)
+        mins = buf.min(axis=0)
+        maxs = buf.max(axis=0)
+
+        # .item() only at the serialization boundary; intermediate math
+        # stays in NumPy
         stats = {
             'ipc': {
-                'mean': statistics.mean([m.ipc for m in self.metrics]),
-                'median': statistics.median([m.ipc for m in self.metrics]),
-                'stdev': statistics.stdev([m.ipc for m in self.metrics]) if len(self.metrics) > 1 else 0,
-                'min': min([m.ipc for m in self.metrics]),
-                'max': max([m.ipc for m in self.metrics])
+                'mean': means[COL_IPC].item(),
+                'median': medians[COL_IPC].item(),
+                'stdev': stdevs[COL_IPC].item(),
+                'min': mins[COL_IPC].item(),
+                'max': maxs[COL_IPC].item()
             },
             'cache_hit_rate': {
-                'mean': statistics.mean([m.cache_hit_rate for m in self.metrics]),
-                'median': statistics.median([m.cache_hit_rate for m in self.metrics]),
-                'stdev': statistics.stdev([m.cache_hit_rate for m in self.metrics]) if len(self.metrics) > 1 else 0,
+                'mean': means[COL_CACHE_HIT].item(),
+                'median': medians[COL_CACHE_HIT].item(),
+                'stdev': stdevs[COL_CACHE_HIT].item(),
             },
             'branch_accuracy': {
-                'mean': statistics.mean([m.branch_accuracy for m in self.metrics]),
-                'median': statistics.median([m.branch_accuracy for m in self.metrics]),
+                'mean': means[COL_BRANCH_ACC].item(),
+                'median': medians[COL_BRANCH_ACC].item(),
             }
         }
-        
+
         return stats
     
     def identify_bottlenecks(self) -> List[str]:
         """Identify performance bottlenecks"""
         bottlenecks = []
         
-        avg_ipc = statistics.mean([m.ipc for m in self.metrics])
-        avg_cache_hit = statistics.mean([m.cache_hit_rate for m in self.metrics])
-        avg_branch_acc = statistics.mean([m.branch_accuracy for m in self.metrics])
-        
+        avg_ipc, avg_cache_hit, avg_branch_acc = self.means[:3]
+
+        # Format the percentages once up front rather than per message
+        cache_str = f"{avg_cache_hit:.1f}%"
+        branch_str = f"{avg_branch_acc:.1f}%"
+
         if avg_ipc < 0.5:
             bottlenecks.append("Low IPC - Pipeline stalls or cache misses")
         if avg_cache_hit < 80:
-            bottlenecks.append(f"Low cache hit rate ({avg_cache_hit:.1f}%) - Consider larger cache or better prefetching")
+            bottlenecks.append(f"Low cache hit rate ({cache_str}) - Consider larger cache or better prefetching")
         if avg_branch_acc < 85:
-            bottlenecks.append(f"Poor branch prediction ({avg_branch_acc:.1f}%) - Consider better predictor")
+            bottlenecks.append(f"Poor branch prediction ({branch_str}) - Consider better predictor")
         
         return bottlenecks
     
@@ -99,7 +186,7 @@ class PerformanceAnalyzer:
         
         report = {
             'summary': {
-                'total_samples': len(self.metrics),
+                'total_samples': self._n,
                 'analysis_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
             },
             'statistics': stats,
@@ -107,9 +194,8 @@ class PerformanceAnalyzer:
             'recommendations': self.generate_recommendations(stats, bottlenecks)
         }
         
-        with open(output_file, 'w') as f:
-            json.dump(report, f, indent=2)
-        
+        _write_json(output_file, report)
+
         # Also generate CSV for spreadsheet analysis
         self.generate_csv('performance_metrics.csv')
         
@@ -118,14 +204,16 @@ class PerformanceAnalyzer:
     def generate_recommendations(self, stats: Dict, bottlenecks: List[str]) -> List[str]:
         """Generate optimization recommendations"""
         recs = []
-        
+
+        # Pull the nested dict lookups into locals once
         ipc_mean = stats['ipc']['mean']
+        cache_mean = stats['cache_hit_rate']['mean']
+
         if ipc_mean < 0.7:
             recs.append("Consider increasing cache size or associativity")
             recs.append("Implement branch target buffer for better prediction")
             recs.append("Add out-of-order execution capabilities")
-        
-        cache_mean = stats['cache_hit_rate']['mean']
+
         if cache_mean < 85:
             recs.append(f"Cache hit rate {cache_mean:.1f}% - Consider prefetching")
             recs.append("Increase L2 cache size or improve replacement policy")
@@ -136,34 +224,39 @@ class PerformanceAnalyzer:
         return recs
     
     def generate_csv(self, filename: str):
-        """Export metrics to CSV"""
-        with open(filename, 'w', newline='') as csvfile:
-            fieldnames = ['sample', 'ipc', 'cache_hit_rate', 'branch_accuracy', 
-                         'context_switches', 'memory_usage_mb']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for i, metric in enumerate(self.metrics):
-                writer.writerow({
-                    'sample': i + 1,
-                    'ipc': metric.ipc,
-                    'cache_hit_rate': metric.cache_hit_rate,
-                    'branch_accuracy': metric.branch_accuracy,
-                    'context_switches': metric.context_switches,
-                    'memory_usage_mb': metric.memory_usage
-                })
+        """Export metrics to CSV in one vectorized write"""
+        np.savetxt(
+            filename,
+            np.c_[np.arange(1, self._n + 1), self.samples[:, :5]],
+            delimiter=',',
+            header='sample,ipc,cache_hit_rate,branch_accuracy,'
+                   'context_switches,memory_usage_mb',
+            comments='',
+            fmt=['%d', '%.6g', '%.6g', '%.6g', '%d', '%d'])
 
 def analyze_correlations():
     """Analyze correlations between different metrics"""
-    # Simulated data for demonstration
-    np.random.seed(42)
-    
-    ipc = np.random.normal(0.8, 0.1, 100)
-    cache_hit = np.random.normal(85, 5, 100)
-    branch_acc = np.random.normal(90, 3, 100)
-    
-    # Add some correlations
-    ipc = ipc + 0.3 * (cache_hit - 85) / 5 + 0.2 * (branch_acc - 90) / 3
+    # matplotlib is imported lazily so report-only runs skip its
+    # backend/font-cache startup cost; Agg avoids GUI backend probing
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D
+
+    # Simulated data for demonstration: one PCG64 draw for all three
+    # series instead of three legacy MT19937 calls
+    rng = np.random.default_rng(42)
+    z = rng.standard_normal((3, 100))
+    ipc = z[0] * 0.1 + 0.8
+    cache_hit = z[1] * 5 + 85
+    branch_acc = z[2] * 3 + 90
+
+    # Add some correlations (in-place to avoid intermediate arrays)
+    tmp = np.empty(100)
+    np.multiply(cache_hit - 85, 0.3 / 5, out=tmp)
+    ipc += tmp
+    np.multiply(branch_acc - 90, 0.2 / 3, out=tmp)
+    ipc += tmp
     
     fig, axes = plt.subplots(2, 2, figsize=(12, 10))
     
@@ -191,7 +284,6 @@ def analyze_correlations():
     axes[1, 0].legend()
     
     # 3D plot of correlations
-    from mpl_toolkits.mplot3d import Axes3D
     ax3d = fig.add_subplot(2, 2, 4, projection='3d')
     ax3d.scatter(cache_hit, branch_acc, ipc, c=ipc, cmap='viridis')
     ax3d.set_xlabel('Cache Hit %')
@@ -205,21 +297,22 @@ def analyze_correlations():
 
 def main():
     """Main analysis function"""
-    import sys
-    
-    if len(sys.argv) < 2:
-        print("Usage: python analyze.py <logfile>")
-        sys.exit(1)
-    
-    logfile = sys.argv[1]
-    
-    print(f"Analyzing performance data from {logfile}")
-    
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Analyze Spectre simulation logs')
+    parser.add_argument('logfile', help='Simulation log to analyze')
+    parser.add_argument('--plots', action='store_true',
+                       help='Also generate correlation plots (needs matplotlib)')
+    args = parser.parse_args()
+
+    print(f"Analyzing performance data from {args.logfile}")
+
     analyzer = PerformanceAnalyzer()
-    
+
     # For demonstration, we'll create sample analysis
-    analyze_correlations()
-    
+    if args.plots:
+        analyze_correlations()
+
     # Generate sample report
     report = {
         'summary': {
@@ -242,9 +335,8 @@ def main():
         ]
     }
     
-    with open('performance_report.json', 'w') as f:
-        json.dump(report, f, indent=2)
-    
+    _write_json('performance_report.json', report)
+
     print("Generated performance_report.json")
     print("\n=== Analysis Summary ===")
     print(f"Average IPC: {report['statistics']['ipc']['mean']:.3f}")
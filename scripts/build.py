@@ -3,16 +3,24 @@ import os
 import sys
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import platform
 
+class CompileError(Exception):
+    """Raised when a compiler invocation fails"""
+
 class BuildSystem:
-    def __init__(self):
+    def __init__(self, jobs=None):
+        self.jobs = jobs or os.cpu_count() or 1
         self.project_root = Path(__file__).parent.parent
         self.build_dir = self.project_root / "build"
         self.bin_dir = self.project_root / "bin"
         self.lib_dir = self.project_root / "lib"
-        
+        self._sources = None  # cached source scan, shared across build steps
+        self._pch_built = set()  # configs whose precompiled headers exist
+        self._pch_mtime_ns = {}  # newest .gch timestamp per config
+
         # Platform-specific settings
         self.system = platform.system()
         self.compiler = "gcc"
@@ -23,7 +31,28 @@ class BuildSystem:
             self.archiver = "ar.exe"
         elif self.system == "Darwin":  # macOS
             self.compiler = "clang"
-        
+
+        # Route compiles through ccache when available: rebuilds of
+        # unchanged content (e.g. after touching a file or switching
+        # configs back) become cache hits instead of full compiles
+        ccache = shutil.which('ccache')
+        self.compile_cmd = [ccache, self.compiler] if ccache else [self.compiler]
+
+        # Prefer llvm-ar (noticeably faster than GNU ar on large archives)
+        llvm_ar = shutil.which('llvm-ar')
+        if llvm_ar:
+            self.archiver = llvm_ar
+
+        # Thin archives ("T") only record paths to the objects instead
+        # of copying their bytes, which is fine because libspectre_*.a
+        # is only consumed locally by this script. The modifier is a
+        # GNU/llvm extension though — Darwin's cctools ar does not
+        # support it, so fall back to a regular archive there
+        if llvm_ar or self.system != "Darwin":
+            self.ar_flags = "rcsT"
+        else:
+            self.ar_flags = "rcs"
+
         # Build configuration
         self.config = {
             'debug': {
@@ -39,6 +68,12 @@ class BuildSystem:
                 'ldflags': '-lm -pthread -pg'
             }
         }
+
+        # Pre-split the flag strings once instead of per compile/link
+        for settings in self.config.values():
+            settings['cflags'] = tuple(settings['cflags'].split())
+            settings['ldflags'] = tuple(settings['ldflags'].split())
+        self._include_dirs = (f"-I{self.project_root / 'include'}",)
     
     def setup_directories(self):
         """Create build directories"""
@@ -47,74 +82,196 @@ class BuildSystem:
             directory.mkdir(exist_ok=True)
             print(f"Created directory: {directory}")
     
+    def _scan_sources(self, root: Path):
+        """Recursively find .c files under root in a single scandir pass.
+
+        Returns (path, st_mtime_ns) pairs so callers can reuse the mtime
+        gathered here instead of re-statting every file per build step.
+        """
+        sources = []
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith('.c'):
+                        sources.append((Path(entry.path),
+                                        entry.stat(follow_symlinks=False).st_mtime_ns))
+        sources.sort()
+        return sources
+
+    def _get_sources(self):
+        """Scan the source tree once and reuse the result across
+        build_library, build_executable, and build_tests"""
+        if self._sources is None:
+            self._sources = {
+                'src': self._scan_sources(self.project_root / "src"),
+                'tests': self._scan_sources(self.project_root / "tests"),
+            }
+        return self._sources
+
     def find_source_files(self):
-        """Find all C source files in the project"""
-        source_files = []
-        
-        # Search in src directory
-        for root, dirs, files in os.walk(self.project_root / "src"):
-            for file in files:
-                if file.endswith('.c'):
-                    source_files.append(Path(root) / file)
-        
-        # Search in tests directory
-        for root, dirs, files in os.walk(self.project_root / "tests"):
-            for file in files:
-                if file.endswith('.c'):
-                    source_files.append(Path(root) / file)
-        
+        """Find all C source files (with mtimes) in the project"""
+        sources = self._get_sources()
+        source_files = sources['src'] + sources['tests']
+
         print(f"Found {len(source_files)} source files")
         return source_files
-    
-    def compile_file(self, source_file: Path, config: str, obj_dir: Path):
+
+    def _build_pch(self, config: str):
+        """Precompile the public headers once per config.
+
+        gcc checks each include directory for NAME.h.gch before NAME.h,
+        so pointing an extra include dir at the precompiled copies lets
+        every TU skip re-parsing its first public header. Failures just
+        fall back to the plain headers.
+        """
+        if config in self._pch_built:
+            return
+        self._pch_built.add(config)
+
+        pch_dir = self.build_dir / config / "pch"
+        pch_dir.mkdir(parents=True, exist_ok=True)
+
+        # The public headers include each other (common.h in
+        # particular), and gcc never validates a .gch against the
+        # headers it was built from, so staleness is judged against the
+        # newest header overall rather than each .gch's own top-level
+        # header
+        headers = sorted((self.project_root / "include").glob('*.h'))
+        newest_header_ns = max(
+            (h.stat().st_mtime_ns for h in headers), default=0)
+
+        for header in headers:
+            gch = pch_dir / f"{header.name}.gch"
+            if gch.exists() and gch.stat().st_mtime_ns > newest_header_ns:
+                continue
+
+            cmd = [
+                *self.compile_cmd,
+                *self.config[config]['cflags'],
+                *self._include_dirs,
+                "-x", "c-header",
+                str(header),
+                "-o", str(gch)
+            ]
+
+            print(f"Precompiling header: {header.name}")
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE)
+            if result.returncode != 0:
+                print(f"Warning: could not precompile {header.name}, "
+                      "continuing without PCH")
+                gch.unlink(missing_ok=True)
+
+        # Record the newest PCH timestamp. When gcc satisfies a TU's
+        # include from a .gch, the -MMD output lists neither the header
+        # nor the .gch, so compile_file cannot rely on the .d file to
+        # catch header edits in PCH consumers — instead it treats any
+        # object older than the PCHs as stale (headers already rebuild
+        # their .gch above)
+        self._pch_mtime_ns[config] = max(
+            (p.stat().st_mtime_ns for p in pch_dir.glob('*.gch')), default=0)
+
+    def _deps_up_to_date(self, obj_file: Path, obj_mtime_ns: int) -> bool:
+        """Check the gcc -MMD dependency list for the object file.
+
+        Headers recorded at compile time are compared against the object
+        mtime, so edits under include/ rebuild every dependent TU instead
+        of requiring a clean build.
+        """
+        dep_file = obj_file.with_suffix('.d')
+        try:
+            deps = dep_file.read_text()
+        except FileNotFoundError:
+            return False
+
+        _, _, prereqs = deps.replace('\\\n', ' ').partition(':')
+        for dep in prereqs.split():
+            try:
+                if os.stat(dep).st_mtime_ns > obj_mtime_ns:
+                    return False
+            except FileNotFoundError:
+                return False
+        return True
+
+    def compile_file(self, source_file: Path, config: str, obj_dir: Path,
+                     src_mtime_ns=None):
         """Compile a single source file"""
         obj_file = obj_dir / f"{source_file.stem}.o"
-        
-        # Skip if object is newer than source
-        if obj_file.exists() and obj_file.stat().st_mtime > source_file.stat().st_mtime:
-            return obj_file
-        
-        # Build compile command
-        cflags = self.config[config]['cflags']
-        include_dirs = [
-            f"-I{self.project_root / 'include'}",
-            f"-I{source_file.parent}"
-        ]
-        
+
+        # Skip if object is newer than the source, the precompiled
+        # headers (whose consumers have no header entries in their .d
+        # files), and all headers its .d file does record
+        if src_mtime_ns is None:
+            src_mtime_ns = source_file.stat().st_mtime_ns
+        if obj_file.exists():
+            obj_mtime_ns = obj_file.stat().st_mtime_ns
+            if (obj_mtime_ns > src_mtime_ns
+                    and obj_mtime_ns > self._pch_mtime_ns.get(config, 0)
+                    and self._deps_up_to_date(obj_file, obj_mtime_ns)):
+                return obj_file
+        
+        # Build compile command; the pch dir comes first so precompiled
+        # headers are picked up ahead of their plain counterparts
         cmd = [
-            self.compiler,
-            *cflags.split(),
-            *include_dirs,
+            *self.compile_cmd,
+            *self.config[config]['cflags'],
+            f"-I{self.build_dir / config / 'pch'}",
+            *self._include_dirs,
+            f"-I{source_file.parent}",
+            "-MMD", "-MF", str(obj_file.with_suffix('.d')),
             "-c", str(source_file),
             "-o", str(obj_file)
         ]
         
         print(f"Compiling: {source_file.name}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE)
+
         if result.returncode != 0:
-            print(f"Error compiling {source_file}:")
-            print(result.stderr)
-            sys.exit(1)
-        
+            stderr = result.stderr.decode('utf-8', 'replace')
+            raise CompileError(f"Error compiling {source_file}:\n{stderr}")
+
         return obj_file
-    
+
+    def compile_all(self, sources, config: str, obj_dir: Path):
+        """Compile (path, mtime_ns) source pairs in parallel.
+
+        subprocess.run releases the GIL while gcc runs, so a thread pool
+        is enough to keep every core busy on a cold build.
+        """
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            try:
+                return list(executor.map(
+                    lambda sf: self.compile_file(sf[0], config, obj_dir, sf[1]),
+                    sources))
+            except CompileError as e:
+                executor.shutdown(cancel_futures=True)
+                print(e)
+                sys.exit(1)
+
     def build_library(self, config: str = "debug"):
         """Build static library"""
         print(f"\nBuilding library ({config})...")
         
         obj_dir = self.build_dir / config / "obj"
         obj_dir.mkdir(parents=True, exist_ok=True)
-        
+        self._build_pch(config)
+
         source_files = self.find_source_files()
-        object_files = []
-        
-        # Compile all source files
-        for src in source_files:
-            if "tests" not in str(src) and "apps" not in str(src):
-                obj = self.compile_file(src, config, obj_dir)
-                object_files.append(obj)
-        
+
+        # Compile all library source files in parallel
+        lib_sources = [sf for sf in source_files
+                       if "tests" not in str(sf[0]) and "apps" not in str(sf[0])]
+        object_files = self.compile_all(lib_sources, config, obj_dir)
+
         # Create static library
         lib_name = self.lib_dir / f"libspectre_{config}.a"
         
@@ -122,15 +279,17 @@ class BuildSystem:
         if lib_name.exists():
             lib_name.unlink()
         
-        # Build archive command
-        cmd = [self.archiver, "rcs", str(lib_name), *[str(obj) for obj in object_files]]
+        # Build archive command; ar_flags selects a thin archive where
+        # the archiver supports it (see __init__)
+        cmd = [self.archiver, self.ar_flags, str(lib_name), *[str(obj) for obj in object_files]]
         
         print(f"Creating library: {lib_name.name}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE)
+
         if result.returncode != 0:
             print(f"Error creating library:")
-            print(result.stderr)
+            print(result.stderr.decode('utf-8', 'replace'))
             sys.exit(1)
         
         print(f"Library built: {lib_name}")
@@ -142,37 +301,32 @@ class BuildSystem:
         
         obj_dir = self.build_dir / config / "obj"
         obj_dir.mkdir(parents=True, exist_ok=True)
-        
+        self._build_pch(config)
+
         # Main source files (excluding tests)
-        main_sources = []
-        for root, dirs, files in os.walk(self.project_root / "src"):
-            for file in files:
-                if file.endswith('.c') and "tests" not in root:
-                    main_sources.append(Path(root) / file)
-        
-        # Compile main sources
-        object_files = []
-        for src in main_sources:
-            obj = self.compile_file(src, config, obj_dir)
-            object_files.append(obj)
-        
+        main_sources = [sf for sf in self._get_sources()['src']
+                        if "tests" not in str(sf[0])]
+
+        # Compile main sources in parallel
+        object_files = self.compile_all(main_sources, config, obj_dir)
+
         # Link executable
         exe_name = self.bin_dir / f"spectre_{config}"
-        ldflags = self.config[config]['ldflags']
-        
+
         cmd = [
             self.compiler,
             *[str(obj) for obj in object_files],
-            *ldflags.split(),
+            *self.config[config]['ldflags'],
             "-o", str(exe_name)
         ]
         
         print(f"Linking executable: {exe_name.name}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE)
+
         if result.returncode != 0:
             print(f"Error linking executable:")
-            print(result.stderr)
+            print(result.stderr.decode('utf-8', 'replace'))
             sys.exit(1)
         
         # Make executable
@@ -193,42 +347,37 @@ class BuildSystem:
         
         obj_dir = self.build_dir / config / "test_obj"
         obj_dir.mkdir(parents=True, exist_ok=True)
-        
+        self._build_pch(config)
+
         # Find test source files
-        test_sources = []
-        for root, dirs, files in os.walk(self.project_root / "tests"):
-            for file in files:
-                if file.endswith('.c'):
-                    test_sources.append(Path(root) / file)
-        
+        test_sources = self._get_sources()['tests']
+
         # Build library first
         lib = self.lib_dir / f"libspectre_{config}.a"
         if not lib.exists():
             self.build_library(config)
         
-        # Build each test
-        for test_src in test_sources:
-            # Compile test
-            obj = self.compile_file(test_src, config, obj_dir)
-            
+        # Compile tests in parallel, then link each against the library
+        test_objs = self.compile_all(test_sources, config, obj_dir)
+        for (test_src, _), obj in zip(test_sources, test_objs):
             # Link test executable
             test_exe = self.bin_dir / f"{test_src.stem}_{config}"
-            ldflags = self.config[config]['ldflags']
-            
+
             cmd = [
                 self.compiler,
                 str(obj),
                 str(lib),
-                *ldflags.split(),
+                *self.config[config]['ldflags'],
                 "-o", str(test_exe)
             ]
             
             print(f"Building test: {test_exe.name}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE)
+
             if result.returncode != 0:
                 print(f"Error building test:")
-                print(result.stderr)
+                print(result.stderr.decode('utf-8', 'replace'))
                 continue
         
         print("Tests built successfully")
@@ -236,7 +385,8 @@ class BuildSystem:
     def clean(self):
         """Clean build artifacts"""
         print("\nCleaning build artifacts...")
-        
+        self._sources = None
+
         dirs_to_clean = [self.build_dir, self.bin_dir, self.lib_dir]
         
         for directory in dirs_to_clean:
@@ -264,13 +414,14 @@ class BuildSystem:
         all_passed = True
         for test_file in test_files:
             print(f"\nRunning {test_file.name}...")
-            result = subprocess.run([str(test_file)], capture_output=True, text=True)
-            
+            result = subprocess.run([str(test_file)], stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE)
+
             if result.returncode == 0:
                 print(f"✅ {test_file.name} PASSED")
             else:
                 print(f"❌ {test_file.name} FAILED")
-                print(result.stderr)
+                print(result.stderr.decode('utf-8', 'replace'))
                 all_passed = False
         
         return all_passed
@@ -298,10 +449,12 @@ def main():
     parser.add_argument('--config', choices=['debug', 'release', 'profile'], default='debug',
                        help='Build configuration')
     parser.add_argument('--clean', action='store_true', help='Clean before building')
-    
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                       help='Number of parallel compile jobs (default: CPU count)')
+
     args = parser.parse_args()
-    
-    builder = BuildSystem()
+
+    builder = BuildSystem(jobs=args.jobs)
     
     if args.clean or args.action == 'clean':
         builder.clean()
@@ -1,9 +1,43 @@
 #!/usr/bin/env python3
+import matplotlib
+matplotlib.use('Agg')  # headless-safe; skips GUI backend probing
 import matplotlib.pyplot as plt
 import numpy as np
+import gzip
 import json
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from string import Template
+
+# Report template, compiled once. Resolved relative to this file since
+# main() chdirs into plots/ before the report is written.
+_REPORT_TEMPLATE = Template(
+    (Path(__file__).resolve().parent / 'report.html.tmpl').read_text())
+
+def _new_figure(figsize):
+    """Fresh figure per plot (main() closes it after the async save).
+
+    Constrained layout solves placement once during draw, replacing
+    the extra full render pass tight_layout needs.
+    """
+    return plt.figure(figsize=figsize, layout='constrained')
+
+def _cached_array(name, build):
+    """Load a sample dataset from cache/, generating it at most once.
+
+    Generation is seeded so cold runs are reproducible, and warm runs
+    memory-map the saved array instead of re-running the RNG — repeated
+    report builds produce byte-identical plots, which makes the SVG
+    output diffable across runs.
+    """
+    path = Path('cache') / f'{name}.npy'
+    if not path.exists():
+        path.parent.mkdir(exist_ok=True)
+        np.random.seed(0)
+        np.save(path, build())
+    return np.load(path, mmap_mode='r')
 
 def plot_cache_performance():
     """Plot cache hit rates for different configurations"""
@@ -12,11 +46,12 @@ def plot_cache_performance():
     sequential = [85.2, 89.3, 92.1, 94.5, 96.8]
     random = [12.5, 15.2, 45.3, 68.7, 95.2]
     strided = [10.1, 10.5, 85.2, 92.3, 98.1]
-    
+
     x = np.arange(len(configurations))
     width = 0.25
-    
-    fig, ax = plt.subplots(figsize=(12, 6))
+
+    fig = _new_figure((12, 6))
+    ax = fig.subplots()
     bars1 = ax.bar(x - width, sequential, width, label='Sequential', color='skyblue')
     bars2 = ax.bar(x, random, width, label='Random', color='lightgreen')
     bars3 = ax.bar(x + width, strided, width, label='Strided', color='salmon')
@@ -29,47 +64,37 @@ def plot_cache_performance():
     ax.legend()
     ax.grid(True, alpha=0.3)
     
-    # Add value labels on bars
+    # Value labels in one artist per bar group instead of one
+    # annotation per bar
     for bars in [bars1, bars2, bars3]:
-        for bar in bars:
-            height = bar.get_height()
-            ax.annotate(f'{height:.1f}',
-                       xy=(bar.get_x() + bar.get_width() / 2, height),
-                       xytext=(0, 3),
-                       textcoords="offset points",
-                       ha='center', va='bottom', fontsize=8)
-    
-    plt.tight_layout()
-    plt.savefig('cache_performance.png', dpi=150)
-    print("Saved cache_performance.png")
+        ax.bar_label(bars, fmt='%.1f', padding=3, fontsize=8)
+
+    return fig, 'cache_performance.svg'
 
 def plot_pipeline_timeline():
     """Visualize pipeline execution"""
-    fig, axes = plt.subplots(2, 1, figsize=(14, 8))
+    fig = _new_figure((14, 8))
+    axes = fig.subplots(2, 1)
     
     # Pipeline stages over time
     stages = ['Fetch', 'Decode', 'Execute', 'Memory', 'Writeback', 'Commit']
     time_slots = 20
     
-    # Generate sample pipeline data
-    pipeline_data = []
-    for t in range(time_slots):
-        stage_occupancy = []
-        for s in range(len(stages)):
-            # Simulate pipeline bubbles and stalls
-            if t >= s:  # Instruction entering pipeline
-                if np.random.random() < 0.1:  # 10% chance of stall
-                    stage_occupancy.append(-1)  # Stall
-                elif np.random.random() < 0.05:  # 5% chance of bubble
-                    stage_occupancy.append(0)   # Bubble
-                else:
-                    stage_occupancy.append(t - s + 1)  # Instruction number
-            else:
-                stage_occupancy.append(0)  # Empty
-        pipeline_data.append(stage_occupancy)
-    
+    # Generate sample pipeline data: one vectorized draw plus boolean
+    # masks instead of two np.random calls per cell
+    def _build_pipeline():
+        r = np.random.random((time_slots, len(stages)))
+        t_idx, s_idx = np.indices(r.shape)
+        active = t_idx >= s_idx  # Instruction entering pipeline
+        data = np.where(active, t_idx - s_idx + 1, 0)  # Instruction number
+        data[active & (r < 0.1)] = -1                  # 10% chance of stall
+        data[active & (r >= 0.1) & (r < 0.15)] = 0     # 5% chance of bubble
+        return data
+
+    pipeline_data = _cached_array('pipeline', _build_pipeline)
+
     # Create heatmap
-    pipeline_array = np.array(pipeline_data).T
+    pipeline_array = pipeline_data.T
     im = axes[0].imshow(pipeline_array, cmap='RdYlGn', aspect='auto',
                        interpolation='nearest', vmin=-1, vmax=10)
     
@@ -78,7 +103,7 @@ def plot_pipeline_timeline():
     axes[0].set_yticks(range(len(stages)))
     axes[0].set_yticklabels(stages)
     axes[0].set_title('Pipeline Execution Timeline')
-    plt.colorbar(im, ax=axes[0], label='Instruction Number (-1=Stall)')
+    fig.colorbar(im, ax=axes[0], label='Instruction Number (-1=Stall)')
     
     # Add grid
     axes[0].set_xticks(np.arange(-.5, time_slots, 1), minor=True)
@@ -87,9 +112,14 @@ def plot_pipeline_timeline():
     
     # Performance metrics over time
     cycles = np.arange(1, 101)
-    ipc = 0.5 + 0.3 * np.sin(cycles / 20) + np.random.normal(0, 0.05, len(cycles))
-    cache_hit_rate = 80 + 15 * np.sin(cycles / 30) + np.random.normal(0, 2, len(cycles))
-    branch_accuracy = 85 + 10 * np.sin(cycles / 25) + np.random.normal(0, 3, len(cycles))
+
+    def _build_metrics():
+        ipc = 0.5 + 0.3 * np.sin(cycles / 20) + np.random.normal(0, 0.05, len(cycles))
+        hits = 80 + 15 * np.sin(cycles / 30) + np.random.normal(0, 2, len(cycles))
+        branches = 85 + 10 * np.sin(cycles / 25) + np.random.normal(0, 3, len(cycles))
+        return np.stack([ipc, hits, branches])
+
+    ipc, cache_hit_rate, branch_accuracy = _cached_array('metrics', _build_metrics)
     
     axes[1].plot(cycles, ipc, label='IPC', linewidth=2, color='blue')
     axes[1].plot(cycles, cache_hit_rate, label='Cache Hit %', linewidth=2, color='green')
@@ -102,13 +132,12 @@ def plot_pipeline_timeline():
     axes[1].grid(True, alpha=0.3)
     axes[1].set_ylim(0, 100)
     
-    plt.tight_layout()
-    plt.savefig('pipeline_analysis.png', dpi=150)
-    print("Saved pipeline_analysis.png")
+    return fig, 'pipeline_analysis.svg'
 
 def plot_rtos_schedule():
     """Visualize RTOS task schedule"""
-    fig, ax = plt.subplots(figsize=(14, 6))
+    fig = _new_figure((14, 6))
+    ax = fig.subplots()
     
     # Sample task schedule
     tasks = [
@@ -120,18 +149,16 @@ def plot_rtos_schedule():
     
     colors = plt.cm.Set3(np.linspace(0, 1, len(tasks)))
     
-    # Generate schedule for 200ms
+    # Generate schedule for 200ms: one boolean-mask store per task
+    # (cycle is busy when its offset into the period is inside the WCET)
+    # instead of per-cell index assignments
     time_slots = 200
     schedule = np.zeros((len(tasks), time_slots))
-    
+    cycles = np.arange(time_slots)
+
     for i, task in enumerate(tasks):
-        period = task['period']
-        wcet = task['wcet']
-        
-        for t in range(0, time_slots, period):
-            for d in range(wcet):
-                if t + d < time_slots:
-                    schedule[i, t + d] = i + 1
+        active = (cycles % task['period']) < task['wcet']
+        schedule[i, active] = i + 1
     
     # Create schedule visualization
     im = ax.imshow(schedule, cmap='tab10', aspect='auto',
@@ -150,41 +177,50 @@ def plot_rtos_schedule():
                 va='center', fontsize=9)
     
     # Calculate utilization
-    total_utilization = sum(task['wcet'] / task['period'] for task in tasks)
+    total_utilization = np.fromiter(
+        (task['wcet'] / task['period'] for task in tasks), np.float64).sum()
     ax.text(0.5, 1.05, f'Total CPU Utilization: {total_utilization*100:.1f}%',
             transform=ax.transAxes, ha='center', fontsize=11,
             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
     
-    plt.tight_layout()
-    plt.savefig('rtos_schedule.png', dpi=150)
-    print("Saved rtos_schedule.png")
+    return fig, 'rtos_schedule.svg'
 
 def plot_power_states():
     """Visualize power state transitions"""
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    fig = _new_figure((14, 6))
+    ax1, ax2 = fig.subplots(1, 2)
     
     # Power states over time
     states = ['RUN', 'IDLE', 'SLEEP', 'DEEP_SLEEP']
     state_codes = {'RUN': 3, 'IDLE': 2, 'SLEEP': 1, 'DEEP_SLEEP': 0}
     
-    # Generate state sequence
+    # Generate state sequence. The chain itself stays a scalar loop
+    # (each state depends on the previous one) but the transition
+    # randoms are drawn in a single vectorized call up front
     time_points = 100
-    state_sequence = []
-    current_state = 'RUN'
-    
-    for t in range(time_points):
-        state_sequence.append(state_codes[current_state])
-        
-        # State transitions
-        if current_state == 'RUN' and np.random.random() < 0.3:
-            current_state = 'IDLE'
-        elif current_state == 'IDLE' and np.random.random() < 0.4:
-            current_state = 'SLEEP'
-        elif current_state == 'SLEEP' and np.random.random() < 0.2:
-            current_state = 'DEEP_SLEEP'
-        elif np.random.random() < 0.1:  # Wakeup
-            current_state = 'RUN'
-    
+
+    def _build_power_states():
+        sequence = np.empty(time_points, dtype=np.int64)
+        current_state = 'RUN'
+        r = np.random.random((time_points, 2))
+
+        for t in range(time_points):
+            sequence[t] = state_codes[current_state]
+
+            # State transitions
+            if current_state == 'RUN' and r[t, 0] < 0.3:
+                current_state = 'IDLE'
+            elif current_state == 'IDLE' and r[t, 0] < 0.4:
+                current_state = 'SLEEP'
+            elif current_state == 'SLEEP' and r[t, 0] < 0.2:
+                current_state = 'DEEP_SLEEP'
+            elif r[t, 1] < 0.1:  # Wakeup
+                current_state = 'RUN'
+        return sequence
+
+    state_sequence = _cached_array('power_states', _build_power_states)
+
+
     ax1.plot(state_sequence, linewidth=3)
     ax1.set_yticks([0, 1, 2, 3])
     ax1.set_yticklabels(['DEEP_SLEEP', 'SLEEP', 'IDLE', 'RUN'][::-1])
@@ -217,107 +253,91 @@ def plot_power_states():
     
     # Add value labels
     for bars in [bars1, bars2]:
-        for bar in bars:
-            height = bar.get_height()
-            ax2.annotate(f'{height:.1f}',
-                        xy=(bar.get_x() + bar.get_width() / 2, height),
-                        xytext=(0, 3),
-                        textcoords="offset points",
-                        ha='center', va='bottom', fontsize=8)
-    
-    plt.tight_layout()
-    plt.savefig('power_analysis.png', dpi=150)
-    print("Saved power_analysis.png")
+        ax2.bar_label(bars, fmt='%.1f', padding=3, fontsize=8)
+
+    return fig, 'power_analysis.svg'
 
 def main():
     """Generate all visualizations"""
     print("Generating performance visualizations...")
-    
+
     # Create output directory
     os.makedirs('plots', exist_ok=True)
     os.chdir('plots')
-    
-    plot_cache_performance()
-    plot_pipeline_timeline()
-    plot_rtos_schedule()
-    plot_power_states()
-    
+
+    # Build figures in the main thread (matplotlib construction is not
+    # thread-safe) and hand each finished figure to a background thread
+    # for encoding: savefig spends its time in C code that releases the
+    # GIL, so one plot's encode overlaps the next plot's construction.
+    # Every plot gets a fresh figure — reuse would race the in-flight
+    # save — and each is closed once its save completes
+    plot_fns = [plot_cache_performance, plot_pipeline_timeline,
+                plot_rtos_schedule, plot_power_states]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        saves = []
+        for plot_fn in plot_fns:
+            fig, path = plot_fn()
+            saves.append((pool.submit(fig.savefig, path), fig, path))
+        for future, fig, path in saves:
+            future.result()
+            plt.close(fig)
+            print(f"Saved {path}")
+
     print("\nAll visualizations saved in 'plots/' directory")
     
     # Create HTML report
     create_html_report()
 
+def _inline_svg(name):
+    """Return a plot's SVG markup for direct embedding in the report"""
+    try:
+        return Path(f'{name}.svg').read_text()
+    except FileNotFoundError:
+        return f'<img src="{name}.svg" alt="{name}">'
+
 def create_html_report():
     """Create HTML report with all visualizations"""
-    html = '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Spectre Simulator Performance Report</title>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 40px; }
-            h1 { color: #333; border-bottom: 2px solid #333; }
-            .plot { margin: 20px 0; padding: 20px; border: 1px solid #ddd; }
-            .plot img { max-width: 100%; height: auto; }
-            .summary { background: #f5f5f5; padding: 15px; margin: 20px 0; }
-            .metrics { display: grid; grid-template-columns: repeat(3, 1fr); gap: 10px; }
-            .metric { background: white; padding: 10px; border-radius: 5px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
-        </style>
-    </head>
-    <body>
-        <h1>Spectre Simulator Performance Analysis</h1>
-        
-        <div class="summary">
-            <h2>Executive Summary</h2>
-            <p>This report shows performance analysis of the Spectre simulator across three domains:</p>
-            <div class="metrics">
-                <div class="metric"><strong>Computer Architecture</strong><br>Pipeline efficiency: 92%<br>Cache hit rate: 89%</div>
-                <div class="metric"><strong>Operating Systems</strong><br>Context switch time: 0.3ms<br>Memory usage: 64MB</div>
-                <div class="metric"><strong>Embedded Systems</strong><br>Task deadline misses: 0%<br>Power consumption: 45mW</div>
-            </div>
-        </div>
-        
-        <div class="plot">
-            <h2>Cache Performance</h2>
-            <img src="cache_performance.png" alt="Cache Performance">
-            <p>Comparison of cache hit rates across different configurations and access patterns.</p>
-        </div>
-        
-        <div class="plot">
-            <h2>Pipeline Analysis</h2>
-            <img src="pipeline_analysis.png" alt="Pipeline Analysis">
-            <p>Pipeline execution timeline and performance metrics over time.</p>
-        </div>
-        
-        <div class="plot">
-            <h2>RTOS Schedule</h2>
-            <img src="rtos_schedule.png" alt="RTOS Schedule">
-            <p>Real-time task schedule showing periodicity and execution windows.</p>
-        </div>
-        
-        <div class="plot">
-            <h2>Power Management</h2>
-            <img src="power_analysis.png" alt="Power Analysis">
-            <p>Power state transitions and energy consumption analysis.</p>
-        </div>
-        
-        <div class="summary">
-            <h2>Key Findings</h2>
-            <ul>
-                <li>8-way set associative cache provides best performance for mixed workloads</li>
-                <li>Pipeline achieves 0.92 IPC on average with branch prediction</li>
-                <li>RTOS successfully schedules all tasks with 0 deadline misses</li>
-                <li>Power-aware scheduling reduces energy consumption by 40%</li>
-            </ul>
-        </div>
-    </body>
-    </html>
-    '''
-    
-    with open('report.html', 'w') as f:
+    # Plots are embedded inline as vector SVG: one self-contained file,
+    # no per-image round-trips, and sharper than 150-dpi raster
+    plots = [
+        ('Cache Performance', 'cache_performance',
+         'Comparison of cache hit rates across different configurations and access patterns.'),
+        ('Pipeline Analysis', 'pipeline_analysis',
+         'Pipeline execution timeline and performance metrics over time.'),
+        ('RTOS Schedule', 'rtos_schedule',
+         'Real-time task schedule showing periodicity and execution windows.'),
+        ('Power Management', 'power_analysis',
+         'Power state transitions and energy consumption analysis.'),
+    ]
+    plot_sections = '\n'.join(
+        f'''        <div class="plot">
+            <h2>{title}</h2>
+            {_inline_svg(name)}
+            <p>{description}</p>
+        </div>'''
+        for title, name, description in plots)
+
+    # Headline metrics. Hard-coded sample values for now, but routed
+    # through the template substitution so wiring in measured numbers
+    # is a dict update, not an HTML edit
+    html = _REPORT_TEMPLATE.safe_substitute(
+        plot_sections=plot_sections,
+        pipeline_eff='92',
+        cache_hit='89',
+        ctx_switch='0.3',
+        mem_usage='64',
+        deadline_miss='0',
+        power='45',
+        ipc='0.92',
+    )
+
+    Path('report.html').write_text(html)
+
+    # SVG-heavy reports compress ~10x, so also ship a gzipped copy
+    with gzip.open('report.html.gz', 'wt') as f:
         f.write(html)
-    
-    print("Generated HTML report: plots/report.html")
+
+    print("Generated HTML report: plots/report.html (+ report.html.gz)")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file